@@ -6,11 +6,19 @@ import pandas as pd
 import yfinance as yf
 import statistics
 import json
+from deadline import gather_with_deadline
+from fetch_data import get_statements
 
-def comp_valuation(ticker):
+def peer_multiples(ticker, peer_deadline=None):
+    """
+    Finds the closest market cap peers and their median valuation multiples.
+
+    Returns:
+    - dict with "peers" (chosen symbols), "peers_used" (peers whose data arrived before
+      peer_deadline) and "medians" (median multiple per metric, None if no peer reported it)
+    """
     # Required Paths
     csv_path = "C:/Users/aidan/Documents/StockProject/resources/Stocks.csv"
-    weights_path = "C:/Users/aidan/Documents/StockProject/config/sector_rules.json"
 
     # Load CSV
     df = pd.read_csv(csv_path)
@@ -50,19 +58,27 @@ def comp_valuation(ticker):
     "P/B": []
     }
 
-    for symbol in peer_symbols:
+    # Pull peer data concurrently; peers still outstanding at peer_deadline are dropped
+    def peer_info(symbol):
         try:
-            info = yf.Ticker(symbol).info
-            if (pe := info.get("trailingPE")) is not None:
-                multiples["P/E"].append(pe)
-            if (ev_ebitda := info.get("enterpriseToEbitda")) is not None:
-                multiples["EV/EBITDA"].append(ev_ebitda)
-            if (ev_rev := info.get("enterpriseToRevenue")) is not None:
-                multiples["EV/Revenue"].append(ev_rev)
-            if (pb := info.get("priceToBook")) is not None:
-                multiples["P/B"].append(pb)
+            return yf.Ticker(symbol).info
         except Exception as e:
             print(f"Error pulling data for peer {symbol}: {e}")
+            return None
+
+    peer_infos, _ = gather_with_deadline(peer_info, peer_symbols, peer_deadline)
+    peers_used = [symbol for symbol in peer_symbols if peer_infos.get(symbol) is not None]
+
+    for symbol in peers_used:
+        info = peer_infos[symbol]
+        if (pe := info.get("trailingPE")) is not None:
+            multiples["P/E"].append(pe)
+        if (ev_ebitda := info.get("enterpriseToEbitda")) is not None:
+            multiples["EV/EBITDA"].append(ev_ebitda)
+        if (ev_rev := info.get("enterpriseToRevenue")) is not None:
+            multiples["EV/Revenue"].append(ev_rev)
+        if (pb := info.get("priceToBook")) is not None:
+            multiples["P/B"].append(pb)
 
     # Find Median Multiples
     medians = {}
@@ -72,35 +88,49 @@ def comp_valuation(ticker):
         else:
             medians[key] = None
 
+    return {"peers": peer_symbols, "peers_used": peers_used, "medians": medians}
+
+
+def comp_valuation(ticker, peer_deadline=None, statements=None, peers=None):
+    # Required Paths
+    weights_path = "C:/Users/aidan/Documents/StockProject/config/sector_rules.json"
+
+    # Peer multiples and target statements (fetched here unless passed in)
+    if peers is None:
+        peers = peer_multiples(ticker, peer_deadline)
+    if statements is None:
+        statements = get_statements(ticker)
+    medians = peers["medians"]
+    peer_symbols = peers["peers"]
+    peers_used = peers["peers_used"]
+
     exit_multiple = medians["EV/EBITDA"]
 
     # Target Stock Data
-    stock = yf.Ticker(ticker)
-    info = stock.info
+    info = statements["info"]
     sector = info.get("sector")
     industry = info.get("industry")
     shares_outstanding = info.get("sharesOutstanding")
     current_price = info.get("currentPrice")
     stock_pb = info.get("priceToBook")
 
-    income_statement = stock.financials
-    balance_sheet = stock.balance_sheet
-
-    try:
-        ebitda = income_statement.loc['Normalized EBITDA'].dropna().iloc[0]
-    except (KeyError, IndexError):
-        ebitda = None
-
-    try:
-        total_revenue = income_statement.loc['Total Revenue'].dropna().iloc[0]
-        net_income = income_statement.loc['Net Income'].dropna().iloc[0]
-        total_debt = balance_sheet.loc['Total Debt'].dropna().iloc[0]
-        cash = balance_sheet.loc['Cash And Cash Equivalents'].dropna().iloc[0]
-        common_equity = balance_sheet.loc['Common Stock Equity'].dropna().iloc[0]
-        preferred_equity = balance_sheet.loc['Preferred Stock Equity'].dropna().iloc[0] if 'Preferred Stock Equity' in balance_sheet.index else 0
-        total_equity = common_equity + preferred_equity
-    except Exception as e:
-        raise ValueError(f"Failed to retrieve required financial data: {e}")
+    income_statement = statements["income"]
+    balance_sheet = statements["balance"]
+
+    ebitda = income_statement["Normalized EBITDA"]
+
+    total_revenue = income_statement["Total Revenue"]
+    net_income = income_statement["Net Income"]
+    total_debt = balance_sheet["Total Debt"]
+    cash = balance_sheet["Cash And Cash Equivalents"]
+    common_equity = balance_sheet["Common Stock Equity"]
+    preferred_equity = balance_sheet["Preferred Stock Equity"] or 0
+    missing = [name for name, value in [("Total Revenue", total_revenue), ("Net Income", net_income),
+               ("Total Debt", total_debt), ("Cash And Cash Equivalents", cash),
+               ("Common Stock Equity", common_equity)] if value is None]
+    if missing:
+        raise ValueError(f"Failed to retrieve required financial data: {', '.join(missing)}")
+    total_equity = common_equity + preferred_equity
     
     # Calculate Valuations
     concluded_values = {}
@@ -131,20 +161,25 @@ def comp_valuation(ticker):
     with open(weights_path, 'r') as f:
         sector_weights = json.load(f)
 
-    weights = sector_weights.get(sector, ("default"))
+    weights = sector_weights.get(sector, sector_weights.get("default"))
 
     weighted_share_price = 0
     for key, value in concluded_values.items():
         weighted_share_price += (value * weights.get(key, 0) / 100)
 
-    # Implied Upside
+    # Implied Upside (None when no peer multiples or price are available, e.g. every peer dropped)
     if current_price and weighted_share_price:
         comps_implied_upside = round(((weighted_share_price / current_price) - 1) * 100, 2)
     else:
         print("Unable to calculate implied upside due to missing data.")
+        comps_implied_upside = None
+        weighted_share_price = None
 
     return {
         "median_ev_ebitda": exit_multiple,
         "implied_upside": comps_implied_upside,
-        "peers": peer_symbols
+        "weighted_share_price": weighted_share_price,
+        "current_price": current_price,
+        "peers": peer_symbols,
+        "peers_used": peers_used
 }
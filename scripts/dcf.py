@@ -4,23 +4,23 @@
 
 import numpy as np
 import pandas as pd
-from fetch_data import get_capIQ_fcf_projections
+from fetch_data import get_capIQ_fcf_projections, get_statements
 from wacc import wacc
 import statistics
 import yfinance as yf
 
-def dcf_valuation(ticker, base_weight, bull_weight, bear_weight, exit_multiple, wacc_value):
+def dcf_valuation(ticker, base_weight, bull_weight, bear_weight, exit_multiple, wacc_value, statements=None):
     years = 10
     capiq_fcf = get_capIQ_fcf_projections(ticker, years=years)
 
-    # Get sector from Yahoo Finance
-    import yfinance as yf
-    stock = yf.Ticker(ticker)
-    info = stock.info
+    # Get sector from Yahoo Finance (unless the statements were already fetched)
+    if statements is None:
+        statements = get_statements(ticker)
+    info = statements["info"]
     sector = info.get("sector")
 
     # Skip DCF for financial companies
-    if "Financial Services" in sector:
+    if sector and "Financial Services" in sector:
         return {"weighted_upside_exit": 0, "weighted_upside_ggm": 0}, f"Skipping DCF valuation for financial company: {ticker}"
     
     prob_sum = base_weight + bull_weight + bear_weight
@@ -181,13 +181,10 @@ def dcf_valuation(ticker, base_weight, bull_weight, bear_weight, exit_multiple,
     ev_bear_exit = pv_bear + disc_tv_exit_bear
 
     # Stock Info
-    stock = yf.Ticker(ticker)
-    info = stock.info
-    income_statement = stock.financials
-    balance_sheet = stock.balance_sheet
+    balance_sheet = statements["balance"]
     shares_outstanding = info.get("sharesOutstanding")
-    cash_equivalents = balance_sheet.loc['Cash And Cash Equivalents'].dropna()
-    total_debt = balance_sheet.loc['Total Debt'].dropna()
+    cash_equivalents = balance_sheet['Cash And Cash Equivalents']
+    total_debt = balance_sheet['Total Debt']
     current_price = info.get("currentPrice")
 
     # Calculate Equity Value
@@ -248,9 +245,16 @@ def dcf_valuation(ticker, base_weight, bull_weight, bear_weight, exit_multiple,
     weighted_upside_ggm = (base_weight * upside_base_ggm) + (bull_weight * upside_bull_ggm) + (bear_weight * upside_bear_ggm)
     weighted_upside_exit = (base_weight * upside_base_exit) + (bull_weight * upside_bull_exit) + (bear_weight * upside_bear_exit)
 
+    # Probability-weighted fair prices don't depend on the current price, so upsides can be re-priced later
+    weighted_fair_price_ggm = (base_weight * fair_price_base_ggm_value) + (bull_weight * fair_price_bull_ggm_value) + (bear_weight * fair_price_bear_ggm_value)
+    weighted_fair_price_exit = (base_weight * fair_price_base_exit_value) + (bull_weight * fair_price_bull_exit_value) + (bear_weight * fair_price_bear_exit_value)
+
     results = {
         "weighted_upside_ggm": weighted_upside_ggm,
-        "weighted_upside_exit": weighted_upside_exit
+        "weighted_upside_exit": weighted_upside_exit,
+        "weighted_fair_price_ggm": weighted_fair_price_ggm,
+        "weighted_fair_price_exit": weighted_fair_price_exit,
+        "current_price": current_price
     }
 
     return results, ""
@@ -0,0 +1,98 @@
+# ---------------------------------
+# Imports
+# ---------------------------------
+
+import threading
+import time
+
+# ---------------------------------
+# Deadline Helpers
+# ---------------------------------
+
+# Cumulative share of the total budget each stage must finish within. Peers, WACC inputs
+# and statements run side by side, projections (the DCF) use whatever is left. Peer
+# multiples stop being collected at "peer_fetch" so comps can finish with a reduced set.
+STAGE_SHARES = {
+    "peer_fetch": 0.3,
+    "peers": 0.6,
+    "wacc": 0.6,
+    "statements": 0.6,
+    "projections": 1.0
+}
+
+
+def stage_deadlines(budget, start=None, shares=None):
+    """
+    Converts a total time budget into absolute per-stage deadlines.
+
+    Parameters:
+    - budget: float, total seconds allowed for the valuation (None = no deadlines)
+    - start: float, time.monotonic() the budget is measured from (default now)
+    - shares: dict, overrides for STAGE_SHARES
+
+    Returns:
+    - dict of stage -> monotonic deadline (or None when there is no budget)
+    """
+    shares = {**STAGE_SHARES, **(shares or {})}
+    if budget is None:
+        return {stage: None for stage in shares}
+
+    start = time.monotonic() if start is None else start
+    return {stage: start + budget * share for stage, share in shares.items()}
+
+
+def remaining(deadline):
+    # Seconds left before a deadline; None means wait indefinitely
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+class StageCall:
+    """
+    Runs fn(*args, **kwargs) on a daemon thread so a hung upstream call can be abandoned.
+    A call that overruns keeps running in the background but its result is ignored.
+    """
+    def __init__(self, fn, *args, **kwargs):
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(fn, args, kwargs), daemon=True)
+        self._thread.start()
+
+    def _run(self, fn, args, kwargs):
+        try:
+            self.result = fn(*args, **kwargs)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+    def wait(self, deadline):
+        """
+        Waits until the call finishes or the deadline passes.
+
+        Returns:
+        - True if the call finished in time (check .error before using .result)
+        """
+        return self._done.wait(remaining(deadline))
+
+
+def gather_with_deadline(fn, items, deadline=None):
+    """
+    Calls fn(item) for every item concurrently and keeps whatever finishes before the deadline.
+
+    Returns:
+    - dict of item -> result for calls that completed without raising
+    - list of items that failed or did not finish in time
+    """
+    calls = {item: StageCall(fn, item) for item in items}
+
+    results = {}
+    missed = []
+    for item, call in calls.items():
+        if call.wait(deadline) and call.error is None:
+            results[item] = call.result
+        else:
+            missed.append(item)
+    return results, missed
@@ -53,5 +53,46 @@ def get_capIQ_fcf_projections(ticker, forecast_path="C:/Users/aidan/Documents/St
         print(f"Error reading CapIQ FCF projections: {e}")
         return None
 
+# ---------------------------------
+# Company Statements Import
+# ---------------------------------
+
+INFO_KEYS = ["sector", "industry", "sharesOutstanding", "currentPrice", "priceToBook", "beta", "regularMarketTime"]
+
+STATEMENT_ROWS = {
+    "income": ["Normalized EBITDA", "Total Revenue", "Net Income", "Tax Provision", "Pretax Income", "Interest Expense"],
+    "balance": ["Total Debt", "Cash And Cash Equivalents", "Common Stock Equity", "Preferred Stock Equity"]
+}
+
+def get_statements(ticker):
+    """
+    Downloads the Yahoo Finance info and statement lines the DCF, WACC and comps models use,
+    so each valuation fetches them once.
+
+    Parameters:
+    - ticker: str, the stock ticker symbol (e.g., "AMZN")
+
+    Returns:
+    - dict with "info" (selected info fields), "income" and "balance" (latest reported value per
+      line item, None if missing) and "statements_date" (date of the latest balance sheet).
+      Plain values only, so the result can be cached as JSON.
+    """
+    stock = yf.Ticker(ticker)
+    info = stock.info
+    income_statement = stock.financials
+    balance_sheet = stock.balance_sheet
 
+    return {
+        "info": {key: info.get(key) for key in INFO_KEYS},
+        "income": latest_values(income_statement, STATEMENT_ROWS["income"]),
+        "balance": latest_values(balance_sheet, STATEMENT_ROWS["balance"]),
+        "statements_date": balance_sheet.columns[0].date().isoformat() if len(balance_sheet.columns) else None
+    }
 
+def latest_values(statement, rows):
+    # Most recent non-missing value of each line item
+    values = {}
+    for row in rows:
+        series = statement.loc[row].dropna() if row in statement.index else None
+        values[row] = float(series.iloc[0]) if series is not None and not series.empty else None
+    return values
@@ -1,33 +1,91 @@
 import tkinter as tk
 from tkinter import messagebox
-from valuation_final import final_val_exit, final_val_ggm
+from watchlist_view import ValuationPool, WatchlistTable, pending_row
 import yfinance as yf
 
-# Function to get the user input and calculate the valuation
-def calculate_valuation():
-    # Get user inputs
-    ticker = ticker_entry.get()
+# Background workers shared by single valuations and the watchlist
+pool = ValuationPool(max_workers=8, budget=30)
+
+# Ticker whose result should also be shown in result_label
+selected_ticker = None
+
+def read_weights():
     base_weight = float(base_weight_entry.get())
     bull_weight = float(bull_weight_entry.get())
     bear_weight = float(bear_weight_entry.get())
+    prob_sum = base_weight + bull_weight + bear_weight
+    if abs(prob_sum - 1.0) > 0.01:
+        raise ValueError(f"Scenario probabilities must add up to 1. Current total: {prob_sum:.2f}")
+    return base_weight, bull_weight, bear_weight
+
+def read_budget():
+    # Seconds each ticker may take before stale or partial inputs are used
+    budget = float(budget_entry.get())
+    if budget <= 0:
+        raise ValueError("Time budget must be greater than 0 seconds.")
+    return budget
+
+def value_tickers(tickers):
+    # Add pending rows right away and let the pool fill them in
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    base_weight, bull_weight, bear_weight = read_weights()
+    budget = read_budget()
+    watchlist_table.upsert([pending_row(t) for t in tickers])
+    pool.submit(tickers, base_weight, bull_weight, bear_weight, budget=budget)
+
+# Function to get the user input and calculate the valuation
+def calculate_valuation():
+    global selected_ticker
+
+    # Get user inputs
+    ticker = ticker_entry.get().strip().upper()
+    if not ticker:
+        messagebox.showerror("Error", "Please enter a stock ticker.")
+        return
 
-    # Call the valuation functions
     try:
-        # Use Exit Multiple or GGM as needed
-        exit_upside, exit_msg = final_val_exit(ticker, base_weight, bull_weight, bear_weight)
-        ggm_upside, ggm_msg = final_val_ggm(ticker, base_weight, bull_weight, bear_weight)
-
-        result_label.config(
-            text=(
-                f"Upside (Comps & Exit): {exit_upside:.2f}%\n"
-                f"Upside (Comps & GGM): {ggm_upside:.2f}%\n"
-                f"{exit_msg if exit_msg else ''}\n"
-            )
-        )
+        value_tickers([ticker])
+        selected_ticker = ticker
+        result_label.config(text=f"Valuing {ticker}...")
     except Exception as e:
         # Handle errors
         messagebox.showerror("Error", f"An error occurred: {e}")
 
+def add_watchlist():
+    try:
+        value_tickers(watchlist_entry.get("1.0", "end").replace(",", " ").split())
+        watchlist_entry.delete("1.0", "end")
+    except Exception as e:
+        messagebox.showerror("Error", f"An error occurred: {e}")
+
+def poll_results():
+    # Move finished rows from the worker queue into the table once per frame
+    rows = pool.drain()
+    if rows:
+        watchlist_table.upsert(rows)
+
+    for row in rows:
+        if row["ticker"] != selected_ticker:
+            continue
+        if row["status"] == "Error":
+            result_label.config(text="Results will appear here")
+            messagebox.showerror("Error", f"An error occurred: {row['note']}")
+        else:
+            exit_text = f"{row['exit']:.2f}%" if row["exit"] is not None else "n/a"
+            result_label.config(
+                text=(
+                    f"Upside (Comps & Exit): {exit_text}\n"
+                    f"Upside (Comps & GGM): {row['ggm']:.2f}%\n"
+                    f"{row['note']}\n"
+                )
+            )
+
+    root.after(watchlist_table.frame_ms, poll_results)
+
+def on_close():
+    pool.shutdown()
+    root.destroy()
+
 # Create the main window
 root = tk.Tk()
 root.title("Stock Valuation")
@@ -57,12 +115,33 @@ bear_weight_label.pack()
 bear_weight_entry = tk.Entry(root)
 bear_weight_entry.pack()
 
+budget_label = tk.Label(root, text="Time Budget per Ticker (s):")
+budget_label.pack()
+
+budget_entry = tk.Entry(root)
+budget_entry.insert(0, "30")
+budget_entry.pack()
+
 calculate_button = tk.Button(root, text="Calculate Valuation", command=calculate_valuation)
 calculate_button.pack()
 
 result_label = tk.Label(root, text="Results will appear here")
 result_label.pack()
 
+watchlist_label = tk.Label(root, text="Watchlist Tickers (comma or space separated):")
+watchlist_label.pack()
+
+watchlist_entry = tk.Text(root, height=3, width=60)
+watchlist_entry.pack()
+
+watchlist_button = tk.Button(root, text="Add to Watchlist", command=add_watchlist)
+watchlist_button.pack()
+
+watchlist_table = WatchlistTable(root, visible_rows=20)
+watchlist_table.pack(fill="both", expand=True)
+
+root.protocol("WM_DELETE_WINDOW", on_close)
+root.after(watchlist_table.frame_ms, poll_results)
+
 # Run the application
 root.mainloop()
-
@@ -0,0 +1,295 @@
+# ---------------------------------
+# Imports
+# ---------------------------------
+
+import json
+import sqlite3
+import statistics
+from datetime import date, datetime
+
+# ---------------------------------
+# Valuation Results Store
+# ---------------------------------
+
+DB_PATH = "C:/Users/aidan/Documents/StockProject/resources/valuations.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS valuations (
+    id INTEGER PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    method TEXT NOT NULL,
+    base_weight REAL NOT NULL,
+    bull_weight REAL NOT NULL,
+    bear_weight REAL NOT NULL,
+    run_date TEXT NOT NULL,
+    valued_at TEXT NOT NULL,
+    sector TEXT,
+    upside REAL NOT NULL,
+    dcf_upside REAL,
+    comps_upside REAL,
+    dcf_weight REAL,
+    comps_weight REAL,
+    wacc REAL,
+    exit_multiple REAL,
+    current_price REAL,
+    price_time TEXT,
+    statements_date TEXT,
+    peers TEXT,
+    message TEXT,
+    degraded TEXT,
+    dcf_fair_price REAL,
+    comps_fair_price REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_valuations_request
+    ON valuations (ticker, method, base_weight, bull_weight, bear_weight, run_date);
+CREATE INDEX IF NOT EXISTS idx_valuations_sector_upside
+    ON valuations (sector, upside DESC);
+CREATE INDEX IF NOT EXISTS idx_valuations_sector_method_upside
+    ON valuations (sector, method, upside DESC);
+CREATE INDEX IF NOT EXISTS idx_valuations_method_upside
+    ON valuations (method, upside DESC);
+CREATE INDEX IF NOT EXISTS idx_valuations_upside
+    ON valuations (upside DESC);
+CREATE INDEX IF NOT EXISTS idx_valuations_latest
+    ON valuations (ticker, method, degraded, id);
+CREATE TABLE IF NOT EXISTS stage_cache (
+    stage TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    cached_at TEXT NOT NULL,
+    PRIMARY KEY (stage, key)
+);
+"""
+
+ADDED_COLUMNS = {
+    "degraded": "TEXT",
+    "dcf_fair_price": "REAL",
+    "comps_fair_price": "REAL"
+}
+
+
+def connect(db_path=DB_PATH):
+    """
+    Opens the valuation results database, creating the table and indexes if needed.
+
+    Parameters:
+    - db_path: str, path to the SQLite file (":memory:" works for throwaway runs)
+
+    Returns:
+    - sqlite3.Connection with rows accessible by column name
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+
+    # Databases created by earlier versions lack the newer columns
+    columns = [row["name"] for row in conn.execute("PRAGMA table_info(valuations)")]
+    for name, column_type in ADDED_COLUMNS.items():
+        if name not in columns:
+            conn.execute(f"ALTER TABLE valuations ADD COLUMN {name} {column_type}")
+    return conn
+
+
+def find_valuation(ticker, method, base_weight, bull_weight, bear_weight, run_date=None, db_path=DB_PATH):
+    """
+    Looks up a stored valuation for an identical request made on the same day.
+    Degraded results (built from stale or partial inputs) are never reused.
+
+    Parameters:
+    - ticker: str, the stock ticker symbol
+    - method: str, "exit" or "ggm"
+    - base_weight, bull_weight, bear_weight: float, scenario probabilities
+    - run_date: str (YYYY-MM-DD), defaults to today
+
+    Returns:
+    - dict of the stored row, or None if this request has not been run today
+    """
+    run_date = run_date or date.today().isoformat()
+    with connect(db_path) as conn:
+        row = conn.execute(
+            """
+            SELECT * FROM valuations
+            WHERE ticker = ? AND method = ? AND base_weight = ? AND bull_weight = ?
+              AND bear_weight = ? AND run_date = ? AND degraded IS NULL
+            """,
+            (ticker.upper(), method, base_weight, bull_weight, bear_weight, run_date)
+        ).fetchone()
+    conn.close()
+
+    if row is None:
+        return None
+    record = dict(row)
+    record["peers"] = json.loads(record["peers"]) if record["peers"] else []
+    return record
+
+
+def save_valuation(record, db_path=DB_PATH):
+    """
+    Persists a valuation result and its inputs. Re-running the same request on the
+    same day replaces the earlier row.
+
+    Parameters:
+    - record: dict with at least ticker, method, the three scenario weights and upside.
+      Optional keys: sector, dcf_upside, comps_upside, dcf_weight, comps_weight, wacc,
+      exit_multiple, current_price, price_time, statements_date, peers, message, degraded
+      (list of input names that fell back to stale or partial data), dcf_fair_price and
+      comps_fair_price (price-independent values the upsides were measured against).
+    """
+    now = datetime.now()
+    row = {
+        "ticker": record["ticker"].upper(),
+        "method": record["method"],
+        "base_weight": record["base_weight"],
+        "bull_weight": record["bull_weight"],
+        "bear_weight": record["bear_weight"],
+        "run_date": record.get("run_date", now.date().isoformat()),
+        "valued_at": now.isoformat(timespec="seconds"),
+        "sector": record.get("sector"),
+        "upside": float(record["upside"]),
+        "dcf_upside": _to_float(record.get("dcf_upside")),
+        "comps_upside": _to_float(record.get("comps_upside")),
+        "dcf_weight": _to_float(record.get("dcf_weight")),
+        "comps_weight": _to_float(record.get("comps_weight")),
+        "wacc": _to_float(record.get("wacc")),
+        "exit_multiple": _to_float(record.get("exit_multiple")),
+        "current_price": _to_float(record.get("current_price")),
+        "price_time": record.get("price_time"),
+        "statements_date": record.get("statements_date"),
+        "peers": json.dumps(list(record.get("peers") or [])),
+        "message": record.get("message"),
+        "degraded": ", ".join(record["degraded"]) if record.get("degraded") else None,
+        "dcf_fair_price": _to_float(record.get("dcf_fair_price")),
+        "comps_fair_price": _to_float(record.get("comps_fair_price")),
+    }
+    columns = ", ".join(row)
+    placeholders = ", ".join(f":{name}" for name in row)
+
+    with connect(db_path) as conn:
+        conn.execute(f"INSERT OR REPLACE INTO valuations ({columns}) VALUES ({placeholders})", row)
+    conn.close()
+
+
+def top_upside(limit=50, sector=None, method=None, max_wacc=None, min_wacc=None, run_date=None, latest_only=True, db_path=DB_PATH):
+    """
+    Ranks stored valuations by implied upside, e.g. the top 50 Technology names
+    with WACC below 9%: top_upside(50, sector="Technology", max_wacc=0.09)
+
+    Parameters:
+    - limit: int, number of rows to return
+    - sector: str, only include this sector
+    - method: str, "exit" or "ggm" (default both)
+    - max_wacc / min_wacc: float, WACC bounds as decimals (0.09 for 9%)
+    - run_date: str (YYYY-MM-DD), only include valuations run on this day
+    - latest_only: bool, rank only the most recent non-degraded row per ticker and method
+      (on run_date, if given)
+      (False ranks every stored row, including history and degraded results)
+
+    Returns:
+    - list of dicts ordered by upside, highest first
+    """
+    filters = []
+    params = []
+    if sector is not None:
+        filters.append("v.sector = ?")
+        params.append(sector)
+    if method is not None:
+        filters.append("v.method = ?")
+        params.append(method)
+    if max_wacc is not None:
+        filters.append("v.wacc < ?")
+        params.append(max_wacc)
+    if min_wacc is not None:
+        filters.append("v.wacc >= ?")
+        params.append(min_wacc)
+    if run_date is not None:
+        filters.append("v.run_date = ?")
+        params.append(run_date)
+    if latest_only:
+        # INSERT OR REPLACE always assigns a new id, so the highest id is the latest run
+        # (the latest on run_date, when one is given)
+        same_day = " AND w.run_date = v.run_date" if run_date is not None else ""
+        filters.append("v.degraded IS NULL")
+        filters.append(
+            f"""v.id = (SELECT MAX(w.id) FROM valuations w
+                        WHERE w.ticker = v.ticker AND w.method = v.method AND w.degraded IS NULL{same_day})"""
+        )
+
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    params.append(limit)
+
+    with connect(db_path) as conn:
+        rows = conn.execute(
+            f"SELECT v.* FROM valuations v {where} ORDER BY v.upside DESC LIMIT ?", params
+        ).fetchall()
+    conn.close()
+
+    results = []
+    for row in rows:
+        record = dict(row)
+        record["peers"] = json.loads(record["peers"]) if record["peers"] else []
+        results.append(record)
+    return results
+
+
+def sector_wacc(sector, db_path=DB_PATH):
+    """
+    Returns:
+    - float, median WACC of the latest non-degraded valuation per ticker in the sector,
+      or None if none are stored
+    """
+    with connect(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT v.ticker, v.id, v.wacc
+            FROM (SELECT MAX(id) AS id FROM valuations
+                  WHERE degraded IS NULL GROUP BY ticker, method) latest
+            JOIN valuations v ON v.id = latest.id
+            WHERE v.sector = ? AND v.wacc IS NOT NULL
+            """,
+            (sector,)
+        ).fetchall()
+    conn.close()
+
+    # Latest per (ticker, method) from SQL; keep the newer method row per ticker
+    latest = {}
+    for row in rows:
+        if row["ticker"] not in latest or row["id"] > latest[row["ticker"]]["id"]:
+            latest[row["ticker"]] = row
+
+    if not latest:
+        return None
+    return statistics.median(row["wacc"] for row in latest.values())
+
+
+def save_stage(stage, key, payload, db_path=DB_PATH):
+    """
+    Caches the last good output of a valuation stage (peers, market WACC inputs, statements)
+    so a later call that overruns its deadline can fall back to it.
+    """
+    with connect(db_path) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO stage_cache (stage, key, payload, cached_at) VALUES (?, ?, ?, ?)",
+            (stage, key, json.dumps(payload, default=float), datetime.now().isoformat(timespec="seconds"))
+        )
+    conn.close()
+
+
+def load_stage(stage, key, db_path=DB_PATH):
+    """
+    Returns:
+    - (payload, cached_at) for the last good output of a stage, or (None, None) if never cached
+    """
+    with connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT payload, cached_at FROM stage_cache WHERE stage = ? AND key = ?", (stage, key)
+        ).fetchone()
+    conn.close()
+
+    if row is None:
+        return None, None
+    return json.loads(row["payload"]), row["cached_at"]
+
+
+def _to_float(value):
+    # yfinance and numpy hand back numpy scalars / None; SQLite only wants plain floats
+    return None if value is None else float(value)
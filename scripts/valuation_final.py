@@ -1,76 +1,248 @@
-from comps import comp_valuation
+from comps import comp_valuation, peer_multiples
 from dcf import dcf_valuation
-from wacc import wacc
+from fetch_data import get_statements
+from wacc import wacc, market_inputs, DEFAULT_WACC
+from results_store import find_valuation, save_valuation, save_stage, load_stage, sector_wacc
+from deadline import StageCall, stage_deadlines
+from datetime import datetime
 import json
-import yfinance as yf
+import threading
+import time
+
+# Results of the last few value_ticker runs, so final_val_exit followed by final_val_ggm
+# for the same request shares one run (degraded results are never reused from the store)
+RECENT_SECONDS = 60
+_recent = {}
+_recent_lock = threading.Lock()
+
+def final_val_exit(ticker, base_weight, bull_weight, bear_weight, budget=None):
+    exit_record = recent_value_ticker(ticker, base_weight, bull_weight, bear_weight, budget)["exit"]
+    if exit_record is None:
+        raise ValueError(f"No peer EV/EBITDA available to use as an exit multiple for {ticker}")
+    return exit_record["upside"], exit_record["message"]
+
+
+def final_val_ggm(ticker, base_weight, bull_weight, bear_weight, budget=None):
+    ggm_record = recent_value_ticker(ticker, base_weight, bull_weight, bear_weight, budget)["ggm"]
+    return ggm_record["upside"], ggm_record["message"]
+
+
+def recent_value_ticker(ticker, base_weight, bull_weight, bear_weight, budget=None):
+    # value_ticker, reusing an identical request made within the last RECENT_SECONDS
+    key = (ticker.upper(), base_weight, bull_weight, bear_weight, budget)
+    now = time.monotonic()
+    with _recent_lock:
+        for stale_key in [k for k, (made_at, _) in _recent.items() if now - made_at > RECENT_SECONDS]:
+            del _recent[stale_key]
+        if key in _recent:
+            return _recent[key][1]
+
+    records = value_ticker(ticker, base_weight, bull_weight, bear_weight, budget)
+    with _recent_lock:
+        _recent[key] = (time.monotonic(), records)
+    return records
+
+
+def value_ticker(ticker, base_weight, bull_weight, bear_weight, budget=None):
+    """
+    Values a ticker with both terminal value methods from a single comps, WACC and DCF run,
+    combining the DCF and comps upsides with the sector weights.
+
+    With a budget (seconds), each stage gets a sub-deadline (see deadline.STAGE_SHARES).
+    A stage that overruns falls back to its last cached inputs, slow peers are dropped from
+    the comps set, and if the DCF or comps can't produce a result the other carries the full
+    weight. Any such inputs are listed in each record's message.
+
+    Returns:
+    - dict with "exit" and "ggm" records (the rows saved to the results store), each holding
+      upside, message, degraded, the DCF/comps upsides, weights and the price-independent
+      dcf_fair_price / comps_fair_price. "exit" is None when no exit multiple is available.
+    """
+    # Reuse an identical valuation already run today
+    stored = {
+        method: find_valuation(ticker, method, base_weight, bull_weight, bear_weight)
+        for method in ("exit", "ggm")
+    }
+    if all(stored.values()):
+        return stored
+
+    deadlines = stage_deadlines(budget)
+    degraded = []
+
+    # Statements, peer multiples and market WACC inputs don't depend on each other, so
+    # download them together; everything after that is calculated locally
+    statements_call = StageCall(get_statements, ticker)
+    peers_call = StageCall(peer_multiples, ticker, deadlines["peer_fetch"])
+    market_call = StageCall(market_inputs)
+
+    # Info and statement lines shared by the comps, WACC and DCF models
+    statements = stage_result(statements_call, "statements", ticker, deadlines["statements"], budget, degraded)
+    info = statements["info"]
+    sector = info.get("sector")
+
+    # Peer multiples. Only full peer sets are cached, so a later fallback never passes off
+    # a reduced set as just "stale"
+    peers = stage_result(
+        peers_call, "peers", ticker, deadlines["peers"], budget, degraded,
+        cache_if=lambda result: len(result["peers_used"]) == len(result["peers"])
+    )
+    if budget is not None and len(peers["peers_used"]) < len(peers["peers"]):
+        degraded.append(f"peers (reduced to {len(peers['peers_used'])} of {len(peers['peers'])})")
 
-def final_val_exit(ticker, base_weight, bull_weight, bear_weight):
     # Get comps data (median EV/EBITDA + comps implied upside)
-    comps = comp_valuation(ticker)
+    try:
+        comps = comp_valuation(ticker, statements=statements, peers=peers)
+    except Exception as e:
+        if budget is None:
+            raise
+        comps = {"median_ev_ebitda": peers["medians"]["EV/EBITDA"], "implied_upside": None, "weighted_share_price": None}
+        print(f"Error calculating comps for {ticker}: {e}")
     exit_multiple = comps["median_ev_ebitda"]
     comps_upside = comps["implied_upside"]
 
-    # Get WACC
-    wacc_value = wacc(ticker)
-
-    # Run DCF with exit multiple
-    dcf_results, dcf_msg = dcf_valuation(
+    # Get WACC from the market inputs, falling back to a sector/default WACC under a budget
+    fallback = {}
+    def market_fallback():
+        fallback["wacc"], label = fallback_wacc(sector)
+        return None, label
+
+    market = stage_result(market_call, "wacc", "market", deadlines["wacc"], budget, degraded, fallback=market_fallback)
+    if market is None:
+        wacc_value = fallback["wacc"]
+    else:
+        try:
+            wacc_value = wacc(ticker, statements=statements, market=market)
+        except Exception:
+            if budget is None:
+                raise
+            wacc_value = None
+        if wacc_value is None and budget is not None:
+            wacc_value, label = fallback_wacc(sector)
+            degraded.append(f"wacc (missing inputs, {label})")
+
+    # Run DCF once; the GGM upside doesn't use the exit multiple. Its output depends on
+    # inputs that change daily, so only its inputs (statements) are cached
+    dcf_call = StageCall(
+        dcf_valuation,
         ticker,
         base_weight,
         bull_weight,
         bear_weight,
-        exit_multiple,
-        wacc_value
+        exit_multiple if exit_multiple is not None else 0,
+        wacc_value,
+        statements
     )
-
-    dcf_upside = dcf_results["weighted_upside_exit"]
-
-    # Set Up Weighting
-    weights_path = "C:/Users/aidan/Documents/StockProject/config/sector_rules.json"
-    stock = yf.Ticker(ticker)
-    info = stock.info
-    sector = info.get("sector")
-
-    with open(weights_path, 'r') as f:
-        sector_weights = json.load(f)
-    weights = sector_weights.get(sector, sector_weights.get("default"))
-
-    # Combine DCF and Comps with your custom weighting logic
-    final_upside_exit = (weights["dcf_weight"] * dcf_upside) + (weights["comps_weight"] * comps_upside)
-    return final_upside_exit, dcf_msg
-
-
-def final_val_ggm(ticker, base_weight, bull_weight, bear_weight):
-    # Get comps (still used for comps_upside)
-    comps = comp_valuation(ticker)
-    comps_upside = comps["implied_upside"]
-
-    # Get WACC
-    wacc_value = wacc(ticker)
-
-    # Run DCF with Gordon Growth model
-    dcf_results, dcf_msg = dcf_valuation(
-        ticker,
-        base_weight,
-        bull_weight,
-        bear_weight,
-        0, # This is a placeholder for the exit multiple in GGM
-        wacc_value
+    dcf_results, dcf_msg = stage_result(
+        dcf_call, "projections", ticker, deadlines["projections"], budget, degraded,
+        cache=False, fallback=lambda: ((None, ""), "comps only")
     )
 
-    dcf_upside = dcf_results["weighted_upside_ggm"]
-
-    # Set Up Weighting
+    # Set Up Weighting; a missing DCF or comps result hands its weight to the other
+    weights = dict(load_sector_weights(sector))
+    if dcf_results is None and comps_upside is None:
+        raise ValueError(f"Neither the DCF nor comps produced a result for {ticker}")
+    if dcf_results is None:
+        weights.update(dcf_weight=0, comps_weight=1)
+    if comps_upside is None:
+        weights.update(dcf_weight=1, comps_weight=0)
+        degraded.append("comps (no usable peer multiples, DCF only)")
+
+    message = dcf_msg
+    if degraded:
+        message = f"{dcf_msg}\nDegraded inputs: {', '.join(degraded)}".strip()
+
+    market_time = info.get("regularMarketTime")
+    records = {}
+    for method in ("exit", "ggm"):
+        if method == "exit" and exit_multiple is None:
+            records[method] = None
+            continue
+
+        dcf_upside = dcf_results[f"weighted_upside_{method}"] if dcf_results is not None else None
+
+        # Combine DCF and Comps with your custom weighting logic
+        final_upside = (weights["dcf_weight"] * (dcf_upside or 0)) + (weights["comps_weight"] * (comps_upside or 0))
+
+        records[method] = {
+            "ticker": ticker,
+            "method": method,
+            "base_weight": base_weight,
+            "bull_weight": bull_weight,
+            "bear_weight": bear_weight,
+            "sector": sector,
+            "upside": final_upside,
+            "dcf_upside": dcf_upside,
+            "comps_upside": comps_upside,
+            "dcf_weight": weights["dcf_weight"],
+            "comps_weight": weights["comps_weight"],
+            "dcf_fair_price": dcf_results.get(f"weighted_fair_price_{method}") if dcf_results is not None else None,
+            "comps_fair_price": comps["weighted_share_price"],
+            "wacc": wacc_value,
+            "exit_multiple": exit_multiple if method == "exit" else None,
+            "peers": peers["peers_used"],
+            "message": message,
+            "degraded": degraded,
+            "current_price": info.get("currentPrice"),
+            "price_time": datetime.fromtimestamp(market_time).isoformat() if market_time else None,
+            "statements_date": statements["statements_date"]
+        }
+
+        # Store the result with its inputs
+        if not dcf_msg.startswith("Error"):
+            save_valuation(records[method])
+
+    return records
+
+
+def load_sector_weights(sector):
     weights_path = "C:/Users/aidan/Documents/StockProject/config/sector_rules.json"
-    stock = yf.Ticker(ticker)
-    info = stock.info
-    sector = info.get("sector")
-
     with open(weights_path, 'r') as f:
         sector_weights = json.load(f)
-    weights = sector_weights.get(sector, sector_weights.get("default"))
-
-    # Combine DCF and Comps
-    final_upside_ggm = (weights["dcf_weight"] * dcf_upside) + (weights["comps_weight"] * comps_upside)
-    return final_upside_ggm, dcf_msg
-
+    return sector_weights.get(sector, sector_weights.get("default"))
+
+
+def stage_result(call, stage, key, deadline, budget, degraded, cache_if=None, fallback=None, cache=True):
+    """
+    Waits for a stage. Under a budget, a stage that overruns or fails falls back to its last
+    cached output, then to fallback() if given, and the fallback is recorded in `degraded`.
+
+    Parameters:
+    - cache_if: function(result) -> bool, whether a finished result is good enough to cache
+    - fallback: function() -> (value, label) used when nothing is cached
+    - cache: bool, False for stages whose output is never cached or reused
+    """
+    finished = call.wait(deadline)
+    if finished and call.error is None and call.result is not None:
+        if cache and (cache_if is None or cache_if(call.result)):
+            save_stage(stage, key, call.result)
+        return call.result
+
+    if budget is None:
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    reason = "failed" if finished else "timed out"
+    stale, cached_at = load_stage(stage, key) if cache else (None, None)
+    if stale is not None:
+        degraded.append(f"{stage} ({reason}, stale from {cached_at})")
+        return stale
+
+    if fallback is not None:
+        value, label = fallback()
+        degraded.append(f"{stage} ({reason}, {label})")
+        return value
+
+    if call.error is not None:
+        raise call.error
+    if finished:
+        return call.result
+    raise TimeoutError(f"{stage} for {key} overran its deadline and no cached data is available")
+
+
+def fallback_wacc(sector):
+    # Median WACC of stored valuations in the same sector, else the default
+    sector_value = sector_wacc(sector) if sector else None
+    if sector_value is not None:
+        return sector_value, f"{sector} median {sector_value:.2%} used"
+    return DEFAULT_WACC, f"default {DEFAULT_WACC:.2%} used"
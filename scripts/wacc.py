@@ -5,80 +5,85 @@
 import yfinance as yf
 import pandas as pd
 import requests
+from fetch_data import get_statements
 
-def wacc(ticker):
-    # Fetch the stock data
-    stock = yf.Ticker(ticker)
-    
-    # Fetch the financials
-    try:
-        income_statement = stock.financials
-        balance_sheet = stock.balance_sheet
-        info = stock.info
-    except Exception as e:
-        print(f"Error fetching financials: {e}")
-        return None
+# Used when a time-budgeted valuation can't get a WACC in time and nothing better is stored
+DEFAULT_WACC = 0.09
+
+# The market return window is fixed, so the ^GSPC history only needs downloading once
+_market_return = None
+
+def market_return_2013_2023():
+    global _market_return
+    if _market_return is None:
+        market = yf.Ticker("^GSPC")
+        data = market.history(start="2013-01-01", end="2023-01-01")
+        total_return = (data['Close'][-1] / data['Close'][0]) - 1
+        _market_return = ((1 + total_return) ** (1 / (len(data) / 252))) - 1
+    return _market_return
+
+def market_inputs():
+    """
+    Downloads the market-wide WACC inputs: the 10-year Treasury yield (^TNX) as the
+    risk-free rate and the 2013-2023 annualised S&P 500 (^GSPC) return.
+
+    Returns:
+    - dict with "risk_free_rate" and "market_return" as decimals
+    """
+    treasury = yf.Ticker("^TNX")
+    data = treasury.history(period="1d")
+    return {
+        "risk_free_rate": float(data['Close'].iloc[-1] / 100),
+        "market_return": float(market_return_2013_2023())
+    }
+
+def wacc(ticker, statements=None, market=None):
+    # Fetch the financials (unless already fetched for this valuation)
+    if statements is None:
+        try:
+            statements = get_statements(ticker)
+        except Exception as e:
+            print(f"Error fetching financials: {e}")
+            return None
+    income_statement = statements["income"]
+    balance_sheet = statements["balance"]
+    info = statements["info"]
     
     # Calculate equity and debt values
-    try:
-        total_debt = balance_sheet.loc['Total Debt'].dropna()
-        common_equity = balance_sheet.loc['Common Stock Equity'].dropna()
-        preferred_equity = balance_sheet.loc['Preferred Stock Equity'].dropna() if 'Preferred Stock Equity' in balance_sheet.index else None
+    total_debt = balance_sheet['Total Debt']
+    common_equity = balance_sheet['Common Stock Equity']
+    preferred_equity = balance_sheet['Preferred Stock Equity'] or 0
 
-        if total_debt.empty or common_equity.empty:
-            raise ValueError("Missing Total Debt or Common Stock Equity in balance sheet.")
-        
-        total_debt = total_debt.iloc[0]
-        common_equity = common_equity.iloc[0]
-        preferred_equity = preferred_equity.iloc[0] if preferred_equity is not None and not preferred_equity.empty else 0
-        
-        total_equity = common_equity + preferred_equity
+    if total_debt is None or common_equity is None:
+        raise ValueError("Missing Total Debt or Common Stock Equity in balance sheet.")
 
-    except KeyError as e:
-        print(f"Key error: {e}")
-        return None
+    total_equity = common_equity + preferred_equity
     
-    # Calculate Tax Rate
-    try:
-        income_tax_expense = income_statement.loc['Tax Provision'].iloc[0] if 'Tax Provision' in income_statement.index else None
-        pre_tax_income = income_statement.loc['Pretax Income'].iloc[0] if 'Pretax Income' in income_statement.index else None
-
     # Calculate Tax Rate if data is available
-        if income_tax_expense is not None and pre_tax_income is not None:
-            tax_rate = income_tax_expense / pre_tax_income
-        else:
-            tax_rate = 0.25
-
-    except Exception as e:
-    # If something goes wrong, print an error and use a default tax rate
+    income_tax_expense = income_statement['Tax Provision']
+    pre_tax_income = income_statement['Pretax Income']
+    if income_tax_expense is not None and pre_tax_income:
+        tax_rate = income_tax_expense / pre_tax_income
+    else:
         tax_rate = 0.25
     
     # Calculate cost of equity
-    # Risk-Free Rate
-    treasury = yf.Ticker("^TNX")
-    data = treasury.history(period="1d")
-    risk_free_rate = data['Close'].iloc[-1] / 100
-
-    # Market Return
-    market = yf.Ticker("^GSPC")
-    data = market.history(start="2013-01-01", end="2023-01-01")
-    total_return = (data['Close'][-1] / data['Close'][0]) - 1
-    market_return = ((1 + total_return) ** (1 / (len(data) / 252))) - 1 
+    # Risk-Free Rate and Market Return
+    if market is None:
+        market = market_inputs()
+    risk_free_rate = market["risk_free_rate"]
+    market_return = market["market_return"]
 
     # Stock Beta
-    beta = stock.info.get("beta", None)
+    beta = info.get("beta", None)
     
     # Cost of Equity
     cost_of_equity = risk_free_rate + beta * (market_return - risk_free_rate)
     
     # Calculate cost of debt
-    interest_expense = income_statement.loc['Interest Expense'].dropna()
-    total_debt = balance_sheet.loc['Total Debt'].dropna()
+    interest_expense = income_statement['Interest Expense']
 
-    if not interest_expense.empty and not total_debt.empty:
-        interest_expense = interest_expense.iloc[0]
-        total_debt = total_debt.iloc[0]
-    
+    if interest_expense is not None:
         if total_debt != 0:
             cost_of_debt = interest_expense / total_debt
         else:
@@ -0,0 +1,263 @@
+# ---------------------------------
+# Imports
+# ---------------------------------
+
+import random
+import statistics
+import time
+import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
+from valuation_final import value_ticker
+
+# ---------------------------------
+# Quote Sources
+# ---------------------------------
+
+class QuoteSource:
+    """
+    Base class for price feeds used by the watchlist. Subclasses implement poll(),
+    returning only the prices that changed since the previous poll.
+    """
+    def __init__(self):
+        self.tickers = []
+
+    def subscribe(self, tickers, prices=None):
+        # prices: latest known price per ticker, for sources that need a starting point
+        self.tickers = [t.upper() for t in tickers]
+
+    def poll(self):
+        raise NotImplementedError
+
+
+class YahooQuoteSource(QuoteSource):
+    """
+    Pulls the latest 1-minute close for every subscribed ticker in a single batched download.
+    """
+    def __init__(self):
+        super().__init__()
+        self.last_prices = {}
+
+    def poll(self):
+        if not self.tickers:
+            return {}
+
+        data = yf.download(self.tickers, period="1d", interval="1m", progress=False, group_by="column")
+        closes = data["Close"]
+        if len(self.tickers) == 1:
+            latest = {self.tickers[0]: closes.dropna().iloc[-1]}
+        else:
+            latest = {t: closes[t].dropna().iloc[-1] for t in self.tickers if not closes[t].dropna().empty}
+
+        changed = {}
+        for ticker, price in latest.items():
+            price = float(price)
+            if self.last_prices.get(ticker) != price:
+                changed[ticker] = price
+                self.last_prices[ticker] = price
+        return changed
+
+
+class SimulatedQuoteSource(QuoteSource):
+    """
+    Local random-walk feed for testing the watchlist without market data.
+
+    Parameters:
+    - start_prices: dict of ticker -> starting price (tickers without one start from the
+      price passed to subscribe)
+    - volatility: float, standard deviation of each price move (0.002 = 0.2%)
+    - move_fraction: float, share of subscribed tickers that move on each poll
+    - seed: int, random seed for repeatable runs
+    """
+    def __init__(self, start_prices=None, volatility=0.002, move_fraction=0.3, seed=None):
+        super().__init__()
+        self.prices = {t.upper(): float(p) for t, p in (start_prices or {}).items()}
+        self.volatility = volatility
+        self.move_fraction = move_fraction
+        self.rng = random.Random(seed)
+
+    def subscribe(self, tickers, prices=None):
+        super().subscribe(tickers)
+        for ticker, price in (prices or {}).items():
+            self.prices.setdefault(ticker.upper(), float(price))
+
+    def poll(self):
+        tickers = [t for t in self.tickers if t in self.prices]
+        if not tickers:
+            return {}
+
+        n_moves = max(1, int(len(tickers) * self.move_fraction))
+        changed = {}
+        for ticker in self.rng.sample(tickers, n_moves):
+            self.prices[ticker] *= 1 + self.rng.gauss(0, self.volatility)
+            changed[ticker] = round(self.prices[ticker], 2)
+        return changed
+
+# ---------------------------------
+# Watchlist
+# ---------------------------------
+
+class Watchlist:
+    """
+    Keeps implied upsides current for a list of tickers. Each ticker is valued once; after
+    that each quote update only re-prices the DCF and comps upsides against the new price.
+    """
+    def __init__(self, tickers, base_weight, bull_weight, bear_weight, source, budget=None, max_workers=8):
+        self.tickers = [t.upper() for t in tickers]
+        self.base_weight = base_weight
+        self.bull_weight = bull_weight
+        self.bear_weight = bear_weight
+        self.source = source
+        self.budget = budget
+        self.max_workers = max_workers
+        self.fair_values = {}
+        self.prices = {}
+        self.upsides = {}
+        self.latencies = []
+        self.failed_cycles = 0
+
+    def load(self):
+        """
+        Values every ticker on a worker pool and keeps the price-independent parts of each
+        valuation: the probability-weighted DCF fair price and the comps weighted share price,
+        with the sector weights used to blend them.
+        """
+        def value(ticker):
+            return value_ticker(ticker, self.base_weight, self.bull_weight, self.bear_weight, self.budget)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {ticker: pool.submit(value, ticker) for ticker in self.tickers}
+
+        for ticker, future in futures.items():
+            try:
+                records = future.result()
+            except Exception as e:
+                print(f"Error valuing {ticker}: {e}")
+                continue
+            self.add(ticker, records)
+
+        self.source.subscribe(list(self.fair_values), self.prices)
+        return self.fair_values
+
+    def add(self, ticker, records):
+        # records: the "exit"/"ggm" dict returned by value_ticker; "exit" is None when no
+        # peer reports EV/EBITDA, in which case only GGM is tracked
+        present = {method: record for method, record in records.items() if record is not None}
+        if not present or any((r["message"] or "").startswith("Error") or not r["current_price"] for r in present.values()):
+            print(f"Skipping {ticker}: no usable valuation to re-price")
+            return
+
+        self.fair_values[ticker] = {
+            method: {
+                "dcf_fair_price": record["dcf_fair_price"],
+                "comps_fair_price": record["comps_fair_price"],
+                "dcf_upside": record["dcf_upside"],
+                "comps_upside": record["comps_upside"],
+                "dcf_weight": record["dcf_weight"],
+                "comps_weight": record["comps_weight"]
+            }
+            for method, record in present.items()
+        }
+        self.prices[ticker] = next(iter(present.values()))["current_price"]
+        self.upsides[ticker] = self.reprice(ticker, self.prices[ticker])
+
+    def reprice(self, ticker, price):
+        """
+        Re-prices each part of the blend separately. A part without a fair price (e.g. the DCF
+        that dcf_valuation skips for Financial Services) keeps its fixed upside; a part that
+        produced no result has zero weight.
+        """
+        scenario_weight = self.base_weight + self.bull_weight + self.bear_weight
+        upsides = {}
+        for method, fair in self.fair_values[ticker].items():
+            if fair["dcf_fair_price"] is not None:
+                dcf_upside = (fair["dcf_fair_price"] / price - scenario_weight) * 100
+            else:
+                dcf_upside = fair["dcf_upside"] or 0
+
+            if fair["comps_fair_price"] is not None:
+                comps_upside = (fair["comps_fair_price"] / price - 1) * 100
+            else:
+                comps_upside = fair["comps_upside"] or 0
+
+            upsides[method] = (fair["dcf_weight"] * dcf_upside) + (fair["comps_weight"] * comps_upside)
+        return upsides
+
+    def tick(self):
+        """
+        Runs one update cycle: polls the quote source once and re-prices only the tickers
+        whose price changed.
+
+        Returns:
+        - dict of ticker -> {"price", "exit", "ggm"} for the updated tickers ("exit" is
+          missing for tickers without an exit multiple)
+        """
+        quotes = self.source.poll()
+
+        updates = {}
+        for ticker, price in quotes.items():
+            if ticker not in self.fair_values or not price:
+                continue
+            self.prices[ticker] = price
+            self.upsides[ticker] = self.reprice(ticker, price)
+            updates[ticker] = {"price": price, **self.upsides[ticker]}
+        return updates
+
+    def run(self, interval=1.0, cycles=None, on_update=None):
+        """
+        Polls the quote source every `interval` seconds and hands each batch of updates to
+        on_update(updates, latency_ms). A cycle that fails is logged and counted, and polling
+        carries on. Runs forever unless `cycles` is given.
+        """
+        on_update = on_update or print_updates
+        count = 0
+        try:
+            while cycles is None or count < cycles:
+                cycle_start = time.perf_counter()
+                try:
+                    updates = self.tick()
+                except Exception as e:
+                    self.failed_cycles += 1
+                    print(f"Quote update failed: {e}")
+                    updates = None
+                latency_ms = (time.perf_counter() - cycle_start) * 1000
+                self.latencies.append(latency_ms)
+                if updates is not None:
+                    on_update(updates, latency_ms)
+                count += 1
+                time.sleep(max(0, interval - (time.perf_counter() - cycle_start)))
+        except KeyboardInterrupt:
+            pass
+        return self.latency_summary()
+
+    def latency_summary(self):
+        if not self.latencies:
+            return {}
+        ordered = sorted(self.latencies)
+        return {
+            "cycles": len(ordered),
+            "failed": self.failed_cycles,
+            "mean_ms": statistics.mean(ordered),
+            "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+            "max_ms": ordered[-1]
+        }
+
+
+def print_updates(updates, latency_ms):
+    for ticker, row in sorted(updates.items()):
+        exit_text = f"{row['exit']:>7.2f}%" if row.get("exit") is not None else "    n/a "
+        print(f"{ticker:<6} ${row['price']:>9.2f}  Exit: {exit_text}  GGM: {row['ggm']:>7.2f}%")
+    print(f"-- {len(updates)} updates in {latency_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: python watchlist.py AAPL MSFT NVDA [--simulated]
+    tickers = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    simulated = "--simulated" in sys.argv
+
+    source = SimulatedQuoteSource() if simulated else YahooQuoteSource()
+    watchlist = Watchlist(tickers, 0.5, 0.25, 0.25, source)
+    watchlist.load()
+
+    print(watchlist.run(interval=1.0 if simulated else 5.0))
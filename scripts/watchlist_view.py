@@ -0,0 +1,205 @@
+# ---------------------------------
+# Imports
+# ---------------------------------
+
+import queue
+import tkinter as tk
+from tkinter import ttk
+from concurrent.futures import ThreadPoolExecutor
+from valuation_final import value_ticker
+
+# ---------------------------------
+# Background Valuation Pool
+# ---------------------------------
+
+class ValuationPool:
+    """
+    Values tickers on worker threads. Finished rows are put on a queue that the GUI
+    drains from the Tk thread, so workers never touch widgets.
+    """
+    def __init__(self, max_workers=8, budget=30):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.results = queue.Queue()
+        self.budget = budget
+
+    def submit(self, tickers, base_weight, bull_weight, bear_weight, budget=None):
+        # budget: seconds per ticker (defaults to the pool's), so a hung upstream call can't hold a worker
+        budget = self.budget if budget is None else budget
+        for ticker in tickers:
+            self.executor.submit(self._value, ticker, base_weight, bull_weight, bear_weight, budget)
+
+    def _value(self, ticker, base_weight, bull_weight, bear_weight, budget):
+        try:
+            records = value_ticker(ticker, base_weight, bull_weight, bear_weight, budget=budget)
+            exit_record = records["exit"]
+            ggm_record = records["ggm"]
+            # dcf_valuation reports bad inputs (e.g. probabilities not adding up to 1) as an
+            # "Error: ..." message with zero upsides, which must not show as a result
+            error = next((r["message"] for r in (exit_record, ggm_record)
+                          if r is not None and (r["message"] or "").startswith("Error")), None)
+            if error is not None:
+                raise ValueError(error.split("\n")[0])
+            degraded = any(r["degraded"] for r in records.values() if r is not None)
+            notes = [r["message"] for r in (exit_record, ggm_record) if r is not None and r["message"]]
+            if exit_record is None:
+                notes.insert(0, "No peer EV/EBITDA for an exit multiple.")
+            row = {
+                "ticker": ticker,
+                "status": "Degraded" if degraded else "Done",
+                "exit": float(exit_record["upside"]) if exit_record is not None else None,
+                "ggm": float(ggm_record["upside"]),
+                "note": " ".join(dict.fromkeys(notes))
+            }
+        except Exception as e:
+            row = {"ticker": ticker, "status": "Error", "exit": None, "ggm": None, "note": str(e)}
+        self.results.put(row)
+
+    def drain(self, max_rows=500):
+        # Collect finished rows without blocking the Tk thread
+        rows = []
+        while len(rows) < max_rows:
+            try:
+                rows.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+# ---------------------------------
+# Virtualized Watchlist Table
+# ---------------------------------
+
+COLUMNS = [
+    ("ticker", "Ticker", 80),
+    ("status", "Status", 80),
+    ("exit", "Upside (Comps & Exit) %", 170),
+    ("ggm", "Upside (Comps & GGM) %", 170),
+    ("note", "Notes", 320)
+]
+
+
+class WatchlistTable(tk.Frame):
+    """
+    Sortable table that only draws the rows currently in view. The full data lives in
+    self.rows; the Treeview holds a fixed set of `visible_rows` items whose values are
+    swapped as the user scrolls, so adding thousands of rows costs no widget inserts.
+    """
+    def __init__(self, master, visible_rows=20, frame_ms=33):
+        super().__init__(master)
+        self.visible_rows = visible_rows
+        self.frame_ms = frame_ms
+        self.rows = []
+        self.index = {}
+        self.offset = 0
+        self.sort_key = None
+        self.sort_reverse = False
+        self._render_pending = False
+
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in COLUMNS], show="headings", height=visible_rows)
+        for key, heading, width in COLUMNS:
+            self.tree.heading(key, text=heading, command=lambda k=key: self.sort_by(k))
+            self.tree.column(key, width=width, anchor="w" if key in ("ticker", "status", "note") else "e")
+        self.items = [self.tree.insert("", "end", values=[""] * len(COLUMNS)) for _ in range(visible_rows)]
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scroll)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_to(self.offset + wheel_step(e.delta)))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.offset - 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.offset + 3))
+
+    def upsert(self, rows):
+        """
+        Adds or replaces rows (matched by ticker) and schedules a single redraw.
+        """
+        for row in rows:
+            if row["ticker"] in self.index:
+                self.rows[self.index[row["ticker"]]] = row
+            else:
+                self.index[row["ticker"]] = len(self.rows)
+                self.rows.append(row)
+        if self.sort_key is not None:
+            self._sort()
+        self.schedule_render()
+
+    def sort_by(self, key):
+        # Clicking the same heading again flips the order
+        self.sort_reverse = not self.sort_reverse if self.sort_key == key else False
+        self.sort_key = key
+        self._sort()
+        self.schedule_render()
+
+    def _sort(self):
+        self.rows = sort_rows(self.rows, self.sort_key, self.sort_reverse)
+        self.index = {row["ticker"]: i for i, row in enumerate(self.rows)}
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.rows)))
+        elif unit == "pages":
+            self.scroll_to(self.offset + int(amount) * self.visible_rows)
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def scroll_to(self, offset):
+        max_offset = max(0, len(self.rows) - self.visible_rows)
+        self.offset = min(max(0, offset), max_offset)
+        self.schedule_render()
+
+    def schedule_render(self):
+        # Coalesce any number of updates within a frame into one redraw
+        if not self._render_pending:
+            self._render_pending = True
+            self.after(self.frame_ms, self.render)
+
+    def render(self):
+        self._render_pending = False
+        self.offset = min(self.offset, max(0, len(self.rows) - self.visible_rows))
+        window = self.rows[self.offset:self.offset + self.visible_rows]
+
+        for i, item in enumerate(self.items):
+            if i < len(window):
+                self.tree.item(item, values=format_row(window[i]))
+            else:
+                self.tree.item(item, values=[""] * len(COLUMNS))
+
+        if self.rows:
+            first = self.offset / len(self.rows)
+            last = min(1.0, (self.offset + self.visible_rows) / len(self.rows))
+            self.scrollbar.set(first, last)
+        else:
+            self.scrollbar.set(0, 1)
+
+
+def sort_rows(rows, key, reverse=False):
+    # Missing values (pending/errored rows) always sort to the bottom
+    present = [r for r in rows if r[key] is not None]
+    missing = [r for r in rows if r[key] is None]
+    present.sort(key=lambda r: r[key], reverse=reverse)
+    return present + missing
+
+
+def wheel_step(delta, rows=3):
+    # Windows reports multiples of 120 per notch and macOS +/-1, so only the sign is reliable
+    if delta > 0:
+        return -rows
+    if delta < 0:
+        return rows
+    return 0
+
+
+def format_row(row):
+    return [
+        row["ticker"],
+        row["status"],
+        f"{row['exit']:.2f}" if row["exit"] is not None else "",
+        f"{row['ggm']:.2f}" if row["ggm"] is not None else "",
+        row["note"]
+    ]
+
+
+def pending_row(ticker):
+    return {"ticker": ticker, "status": "Pending", "exit": None, "ggm": None, "note": ""}
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scripts import each other by module name, the same way gui.py is run
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
@@ -0,0 +1,43 @@
+import builtins
+import os
+import pytest
+import comps
+
+RULES_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "sector_rules.json")
+
+STATEMENTS = {
+    "info": {"sector": "Technology", "industry": "Software", "sharesOutstanding": 100.0,
+             "currentPrice": 10.0, "priceToBook": 5.0},
+    "income": {"Normalized EBITDA": 100.0, "Total Revenue": 400.0, "Net Income": 50.0},
+    "balance": {"Total Debt": 200.0, "Cash And Cash Equivalents": 100.0, "Common Stock Equity": 300.0,
+                "Preferred Stock Equity": None},
+    "statements_date": "2025-12-31"
+}
+
+
+@pytest.fixture(autouse=True)
+def sector_rules(monkeypatch):
+    # comp_valuation reads the weights from a fixed install path; point it at the repo's copy
+    monkeypatch.setattr(comps, "open", lambda path, *args: builtins.open(RULES_PATH, *args), raising=False)
+
+
+def test_comp_valuation_blends_peer_multiples():
+    peers = {"peers": ["MSFT", "ORCL"], "peers_used": ["MSFT", "ORCL"],
+             "medians": {"EV/EBITDA": 12.0, "EV/Revenue": None, "P/E": None, "P/B": None}}
+
+    result = comps.comp_valuation("AAPL", statements=STATEMENTS, peers=peers)
+
+    # (12 * 100 - 200 + 100) / 100 shares = 11.00, weighted 40% for Technology
+    assert result["weighted_share_price"] == pytest.approx(4.4)
+    assert result["implied_upside"] == pytest.approx(-56.0)
+
+
+def test_comp_valuation_without_peers_returns_no_upside():
+    peers = {"peers": ["MSFT", "ORCL"], "peers_used": [],
+             "medians": {"EV/EBITDA": None, "EV/Revenue": None, "P/E": None, "P/B": None}}
+
+    result = comps.comp_valuation("AAPL", statements=STATEMENTS, peers=peers)
+
+    assert result["implied_upside"] is None
+    assert result["weighted_share_price"] is None
+    assert result["median_ev_ebitda"] is None
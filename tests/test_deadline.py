@@ -0,0 +1,46 @@
+import threading
+import time
+import pytest
+from deadline import StageCall, gather_with_deadline, stage_deadlines
+
+
+def test_stage_deadlines_scale_with_budget():
+    deadlines = stage_deadlines(10, start=100.0)
+
+    assert deadlines["peer_fetch"] == pytest.approx(103.0)
+    assert deadlines["wacc"] == pytest.approx(106.0)
+    assert deadlines["projections"] == pytest.approx(110.0)
+    assert set(stage_deadlines(None).values()) == {None}
+
+
+def test_gather_with_deadline_drops_slow_and_failed_items():
+    release = threading.Event()
+
+    def fetch(symbol):
+        if symbol == "SLOW":
+            release.wait(5)
+        if symbol == "BAD":
+            raise ValueError("no data")
+        return symbol.lower()
+
+    start = time.monotonic()
+    results, missed = gather_with_deadline(fetch, ["MSFT", "SLOW", "BAD", "ORCL"], time.monotonic() + 0.2)
+    release.set()
+
+    assert results == {"MSFT": "msft", "ORCL": "orcl"}
+    assert sorted(missed) == ["BAD", "SLOW"]
+    assert time.monotonic() - start < 1
+
+
+def test_gather_without_deadline_waits_for_everything():
+    results, missed = gather_with_deadline(lambda n: n * 2, [1, 2, 3])
+
+    assert results == {1: 2, 2: 4, 3: 6}
+    assert missed == []
+
+
+def test_stage_call_reports_errors():
+    call = StageCall(lambda: 1 / 0)
+
+    assert call.wait(None)
+    assert isinstance(call.error, ZeroDivisionError)
@@ -0,0 +1,112 @@
+import pytest
+import results_store
+
+
+def record(ticker, upside, sector="Technology", method="exit", wacc=0.08, run_date="2026-10-19", **extra):
+    return {
+        "ticker": ticker,
+        "method": method,
+        "base_weight": 0.5,
+        "bull_weight": 0.25,
+        "bear_weight": 0.25,
+        "run_date": run_date,
+        "sector": sector,
+        "upside": upside,
+        "wacc": wacc,
+        "peers": ["MSFT", "ORCL"],
+        **extra
+    }
+
+
+def test_find_valuation_same_day_only(tmp_path):
+    db = str(tmp_path / "valuations.db")
+    results_store.save_valuation(record("aapl", 12.5), db_path=db)
+
+    found = results_store.find_valuation("AAPL", "exit", 0.5, 0.25, 0.25, run_date="2026-10-19", db_path=db)
+    assert found["upside"] == 12.5
+    assert found["peers"] == ["MSFT", "ORCL"]
+    assert results_store.find_valuation("AAPL", "exit", 0.5, 0.25, 0.25, run_date="2026-10-20", db_path=db) is None
+    assert results_store.find_valuation("AAPL", "ggm", 0.5, 0.25, 0.25, run_date="2026-10-19", db_path=db) is None
+
+
+def test_find_valuation_skips_degraded(tmp_path):
+    db = str(tmp_path / "valuations.db")
+    results_store.save_valuation(record("AAPL", 12.5, degraded=["wacc (stale)"]), db_path=db)
+
+    assert results_store.find_valuation("AAPL", "exit", 0.5, 0.25, 0.25, run_date="2026-10-19", db_path=db) is None
+
+
+def test_top_upside_filters_sector_and_wacc(tmp_path):
+    db = str(tmp_path / "valuations.db")
+    results_store.save_valuation(record("AAPL", 10, wacc=0.08), db_path=db)
+    results_store.save_valuation(record("NVDA", 30, wacc=0.10), db_path=db)
+    results_store.save_valuation(record("MSFT", 20, wacc=0.085), db_path=db)
+    results_store.save_valuation(record("XOM", 50, sector="Energy", wacc=0.07), db_path=db)
+
+    ranked = results_store.top_upside(50, sector="Technology", max_wacc=0.09, db_path=db)
+    assert [r["ticker"] for r in ranked] == ["MSFT", "AAPL"]
+
+    assert [r["ticker"] for r in results_store.top_upside(1, db_path=db)] == ["XOM"]
+
+
+def test_top_upside_ranks_latest_non_degraded_row_per_ticker(tmp_path):
+    db = str(tmp_path / "valuations.db")
+    results_store.save_valuation(record("AAPL", 40, run_date="2026-10-18"), db_path=db)
+    results_store.save_valuation(record("AAPL", 10, run_date="2026-10-19"), db_path=db)
+    results_store.save_valuation(record("AAPL", 99, run_date="2026-10-19", method="ggm", degraded=["peers (reduced to 2 of 5)"]), db_path=db)
+    results_store.save_valuation(record("MSFT", 20), db_path=db)
+
+    ranked = results_store.top_upside(50, db_path=db)
+    assert [(r["ticker"], r["method"], r["upside"]) for r in ranked] == [("MSFT", "exit", 20), ("AAPL", "exit", 10)]
+
+    history = results_store.top_upside(50, latest_only=False, db_path=db)
+    assert len(history) == 4
+
+
+def test_sector_ranking_uses_index(tmp_path):
+    conn = results_store.connect(str(tmp_path / "valuations.db"))
+    plan = " ".join(
+        row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM valuations WHERE sector = ? ORDER BY upside DESC LIMIT 50",
+            ("Technology",)
+        )
+    )
+    conn.close()
+
+    assert "idx_valuations_sector_upside" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_top_upside_on_run_date_uses_latest_row_that_day(tmp_path):
+    db = str(tmp_path / "valuations.db")
+    results_store.save_valuation(record("AAPL", 40, run_date="2026-10-18"), db_path=db)
+    results_store.save_valuation(record("AAPL", 10, run_date="2026-10-19"), db_path=db)
+
+    ranked = results_store.top_upside(50, run_date="2026-10-18", db_path=db)
+    assert [(r["ticker"], r["upside"]) for r in ranked] == [("AAPL", 40)]
+
+
+def test_latest_row_lookup_uses_index(tmp_path):
+    conn = results_store.connect(str(tmp_path / "valuations.db"))
+    plan = " ".join(
+        row[3] for row in conn.execute(
+            """EXPLAIN QUERY PLAN SELECT MAX(w.id) FROM valuations w
+               WHERE w.ticker = ? AND w.method = ? AND w.degraded IS NULL""",
+            ("AAPL", "exit")
+        )
+    )
+    conn.close()
+
+    assert "idx_valuations_latest" in plan
+
+
+def test_sector_wacc_uses_latest_row_per_ticker(tmp_path):
+    db = str(tmp_path / "valuations.db")
+    results_store.save_valuation(record("AAPL", 10, wacc=0.20, run_date="2026-10-18"), db_path=db)
+    results_store.save_valuation(record("AAPL", 10, wacc=0.08, run_date="2026-10-19"), db_path=db)
+    results_store.save_valuation(record("AAPL", 10, wacc=0.08, method="ggm", run_date="2026-10-19"), db_path=db)
+    results_store.save_valuation(record("MSFT", 10, wacc=0.10), db_path=db)
+    results_store.save_valuation(record("ORCL", 10, wacc=0.01, degraded=["wacc (timed out)"]), db_path=db)
+
+    assert results_store.sector_wacc("Technology", db_path=db) == pytest.approx(0.09)
+    assert results_store.sector_wacc("Energy", db_path=db) is None
@@ -0,0 +1,252 @@
+import functools
+import threading
+import time
+import pytest
+import results_store
+import valuation_final
+from deadline import StageCall
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    db = str(tmp_path / "valuations.db")
+    for name in ("find_valuation", "save_valuation", "save_stage", "load_stage"):
+        monkeypatch.setattr(valuation_final, name, functools.partial(getattr(results_store, name), db_path=db))
+    return db
+
+
+@pytest.fixture(autouse=True)
+def clear_recent():
+    valuation_final._recent.clear()
+    yield
+    valuation_final._recent.clear()
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """
+    Offline stand-ins for the downloads (statements, peer multiples, market inputs) and the
+    models built on them. Add a stage name to upstream["hang"] to make it overrun.
+    """
+    state = {
+        "calls": {"statements": 0, "peers": 0, "market": 0, "comps": 0, "wacc": 0, "dcf": 0},
+        "peers_used": ["MSFT", "ORCL"],
+        "hang": set(),
+        "release": threading.Event(),
+        "dcf_wacc": []
+    }
+
+    def stage(name):
+        state["calls"][name] += 1
+        if name in state["hang"]:
+            state["release"].wait(5)
+
+    def get_statements(ticker):
+        stage("statements")
+        return {"info": {"sector": "Technology", "currentPrice": 100.0, "regularMarketTime": None},
+                "income": {}, "balance": {}, "statements_date": "2025-12-31"}
+
+    def peer_multiples(ticker, peer_deadline=None):
+        stage("peers")
+        return {"peers": ["MSFT", "ORCL"], "peers_used": list(state["peers_used"]),
+                "medians": {"EV/EBITDA": 12.0 if state["peers_used"] else None}}
+
+    def market_inputs():
+        stage("market")
+        return {"risk_free_rate": 0.04, "market_return": 0.10}
+
+    def comp_valuation(ticker, statements=None, peers=None):
+        stage("comps")
+        has_peers = bool(peers["peers_used"])
+        return {
+            "median_ev_ebitda": peers["medians"]["EV/EBITDA"],
+            "implied_upside": 10.0 if has_peers else None,
+            "weighted_share_price": 110.0 if has_peers else None
+        }
+
+    def wacc(ticker, statements=None, market=None):
+        stage("wacc")
+        return 0.08
+
+    def dcf_valuation(ticker, base_weight, bull_weight, bear_weight, exit_multiple, wacc_value, statements=None):
+        state["dcf_wacc"].append(wacc_value)
+        stage("dcf")
+        return {
+            "weighted_upside_exit": 30.0,
+            "weighted_upside_ggm": 20.0,
+            "weighted_fair_price_exit": 130.0,
+            "weighted_fair_price_ggm": 120.0
+        }, ""
+
+    for name, stub in (("get_statements", get_statements), ("peer_multiples", peer_multiples),
+                       ("market_inputs", market_inputs), ("comp_valuation", comp_valuation),
+                       ("wacc", wacc), ("dcf_valuation", dcf_valuation)):
+        monkeypatch.setattr(valuation_final, name, stub)
+    monkeypatch.setattr(valuation_final, "load_sector_weights", lambda sector: {"dcf_weight": 0.7, "comps_weight": 0.3})
+    monkeypatch.setattr(valuation_final, "sector_wacc", lambda sector: None)
+    yield state
+    state["release"].set()
+
+
+def test_value_ticker_runs_each_stage_once_for_both_methods(store, upstream):
+    records = valuation_final.value_ticker("AAPL", 0.5, 0.25, 0.25)
+
+    assert records["exit"]["upside"] == pytest.approx(0.7 * 30 + 0.3 * 10)
+    assert records["ggm"]["upside"] == pytest.approx(0.7 * 20 + 0.3 * 10)
+    assert records["exit"]["dcf_fair_price"] == 130.0
+    assert records["ggm"]["comps_fair_price"] == 110.0
+    assert records["exit"]["current_price"] == 100.0
+    assert set(upstream["calls"].values()) == {1}
+
+
+def test_final_val_reuses_same_day_result(store, upstream):
+    exit_upside, _ = valuation_final.final_val_exit("AAPL", 0.5, 0.25, 0.25)
+    ggm_upside, _ = valuation_final.final_val_ggm("AAPL", 0.5, 0.25, 0.25)
+
+    assert exit_upside == pytest.approx(24.0)
+    assert ggm_upside == pytest.approx(17.0)
+    assert set(upstream["calls"].values()) == {1}
+
+
+def hung_call():
+    # A stage that never finishes before its deadline
+    release = threading.Event()
+    return StageCall(release.wait, 5), release
+
+
+def past_deadline():
+    return time.monotonic() + 0.05
+
+
+def test_stage_result_caches_and_falls_back_to_stale(store):
+    degraded = []
+    fresh = valuation_final.stage_result(StageCall(lambda: 0.08), "wacc", "AAPL", None, 10, degraded)
+    call, release = hung_call()
+    stale = valuation_final.stage_result(call, "wacc", "AAPL", past_deadline(), 10, degraded)
+    release.set()
+
+    assert fresh == stale == 0.08
+    assert len(degraded) == 1
+    assert degraded[0].startswith("wacc (timed out, stale from ")
+
+
+def test_stage_result_without_budget_raises_errors(store):
+    def fail():
+        raise ValueError("no statements")
+
+    with pytest.raises(ValueError):
+        valuation_final.stage_result(StageCall(fail), "statements", "AAPL", None, None, [])
+
+
+def test_stage_result_times_out_without_cache_or_fallback(store):
+    call, release = hung_call()
+    with pytest.raises(TimeoutError):
+        valuation_final.stage_result(call, "projections", "AAPL", past_deadline(), 10, [])
+    release.set()
+
+
+def test_stage_result_uses_fallback_when_nothing_cached(store):
+    degraded = []
+    call, release = hung_call()
+    value = valuation_final.stage_result(
+        call, "wacc", "AAPL", past_deadline(), 10, degraded, fallback=lambda: (0.09, "default 9.00% used")
+    )
+    release.set()
+
+    assert value == 0.09
+    assert degraded == ["wacc (timed out, default 9.00% used)"]
+
+
+def test_stage_result_skips_caching_when_cache_if_rejects(store):
+    valuation_final.stage_result(StageCall(lambda: {"peers": ["A", "B"], "peers_used": ["A"]}), "peers", "AAPL", None, 10, [],
+                                 cache_if=lambda result: False)
+
+    assert results_store.load_stage("peers", "AAPL", db_path=store) == (None, None)
+
+
+def test_reduced_peer_set_is_labelled_and_not_cached(store, upstream):
+    upstream["peers_used"] = ["MSFT"]
+    records = valuation_final.value_ticker("AAPL", 0.5, 0.25, 0.25, budget=5)
+
+    assert records["exit"]["degraded"] == ["peers (reduced to 1 of 2)"]
+    assert "Degraded inputs: peers (reduced to 1 of 2)" in records["exit"]["message"]
+    assert results_store.load_stage("peers", "AAPL", db_path=store) == (None, None)
+    # Degraded results are stored but never reused
+    assert valuation_final.find_valuation("AAPL", "exit", 0.5, 0.25, 0.25) is None
+
+
+def test_stale_peers_keep_their_peer_count(store, upstream):
+    valuation_final.value_ticker("AAPL", 0.5, 0.25, 0.25, budget=5)
+    upstream["hang"].add("peers")
+
+    records = valuation_final.value_ticker("AAPL", 0.6, 0.2, 0.2, budget=0.2)
+
+    assert records["ggm"]["peers"] == ["MSFT", "ORCL"]
+    assert records["ggm"]["degraded"][0].startswith("peers (timed out, stale from ")
+    assert len(records["ggm"]["degraded"]) == 1
+
+
+def test_zero_peers_weights_dcf_only(store, upstream):
+    upstream["peers_used"] = []
+    records = valuation_final.value_ticker("AAPL", 0.5, 0.25, 0.25, budget=5)
+
+    assert records["exit"] is None
+    assert records["ggm"]["upside"] == pytest.approx(20.0)
+    assert records["ggm"]["comps_upside"] is None
+    assert records["ggm"]["degraded"] == ["peers (reduced to 0 of 2)", "comps (no usable peer multiples, DCF only)"]
+
+
+def test_hung_market_inputs_fall_back_to_sector_median(store, upstream, monkeypatch):
+    for ticker, wacc_value in (("MSFT", 0.07), ("ORCL", 0.08), ("SAP", 0.10)):
+        results_store.save_valuation({"ticker": ticker, "method": "exit", "base_weight": 0.5, "bull_weight": 0.25,
+                                      "bear_weight": 0.25, "sector": "Technology", "upside": 5, "wacc": wacc_value},
+                                     db_path=store)
+    monkeypatch.setattr(valuation_final, "sector_wacc", functools.partial(results_store.sector_wacc, db_path=store))
+    upstream["hang"].add("market")
+
+    records = valuation_final.value_ticker("AAPL", 0.5, 0.25, 0.25, budget=0.2)
+
+    assert upstream["dcf_wacc"] == [0.08]
+    assert records["ggm"]["wacc"] == 0.08
+    assert records["ggm"]["degraded"] == ["wacc (timed out, Technology median 8.00% used)"]
+
+
+def test_fallback_wacc_defaults_without_sector_history(store, monkeypatch):
+    monkeypatch.setattr(valuation_final, "sector_wacc", lambda sector: None)
+
+    assert valuation_final.fallback_wacc("Technology") == (valuation_final.DEFAULT_WACC, "default 9.00% used")
+
+
+def test_slow_dcf_returns_comps_only_result(store, upstream):
+    upstream["hang"].add("dcf")
+    start = time.monotonic()
+
+    records = valuation_final.value_ticker("AAPL", 0.5, 0.25, 0.25, budget=0.3)
+
+    assert time.monotonic() - start < 1
+    assert records["exit"]["upside"] == pytest.approx(10.0)
+    assert records["exit"]["dcf_upside"] is None
+    assert (records["exit"]["dcf_weight"], records["exit"]["comps_weight"]) == (0, 1)
+    assert records["exit"]["degraded"] == ["projections (timed out, comps only)"]
+    # The DCF output is never cached; its statement inputs are
+    assert results_store.load_stage("projections", "AAPL", db_path=store) == (None, None)
+    assert results_store.load_stage("statements", "AAPL", db_path=store)[0]["statements_date"] == "2025-12-31"
+
+
+def test_hung_statements_use_stale_statements(store, upstream):
+    valuation_final.value_ticker("AAPL", 0.5, 0.25, 0.25, budget=5)
+    upstream["hang"].add("statements")
+
+    records = valuation_final.value_ticker("AAPL", 0.6, 0.2, 0.2, budget=0.2)
+
+    assert records["ggm"]["current_price"] == 100.0
+    assert records["ggm"]["degraded"][0].startswith("statements (timed out, stale from ")
+
+
+def test_final_val_wrappers_share_one_degraded_run(store, upstream):
+    upstream["peers_used"] = ["MSFT"]
+    _, exit_msg = valuation_final.final_val_exit("AAPL", 0.5, 0.25, 0.25, budget=5)
+    _, ggm_msg = valuation_final.final_val_ggm("AAPL", 0.5, 0.25, 0.25, budget=5)
+
+    assert "peers (reduced to 1 of 2)" in exit_msg and "peers (reduced to 1 of 2)" in ggm_msg
+    assert upstream["calls"]["wacc"] == 1 and upstream["calls"]["dcf"] == 1
@@ -0,0 +1,131 @@
+import pytest
+import watchlist
+from watchlist import QuoteSource, SimulatedQuoteSource, Watchlist
+
+
+def records(price, dcf_fair, comps_fair, dcf_weight=0.7, comps_weight=0.3, dcf_upside=None):
+    def record(method):
+        if dcf_upside is None:
+            dcf_part = (dcf_fair / price - 1) * 100
+        else:
+            dcf_part = dcf_upside
+        comps_part = (comps_fair / price - 1) * 100
+        return {
+            "method": method,
+            "message": "",
+            "current_price": price,
+            "dcf_fair_price": dcf_fair,
+            "comps_fair_price": comps_fair,
+            "dcf_upside": dcf_part,
+            "comps_upside": comps_part,
+            "dcf_weight": dcf_weight,
+            "comps_weight": comps_weight,
+            "upside": dcf_weight * dcf_part + comps_weight * comps_part
+        }
+    return {"exit": record("exit"), "ggm": record("ggm")}
+
+
+def make_watchlist(source=None):
+    return Watchlist([], 0.5, 0.25, 0.25, source or SimulatedQuoteSource(seed=1))
+
+
+def test_reprice_matches_valuation_at_original_price():
+    wl = make_watchlist()
+    wl.add("AAPL", records(100, 130, 90))
+
+    assert wl.upsides["AAPL"]["exit"] == pytest.approx(0.7 * 30 + 0.3 * -10)
+
+
+def test_reprice_keeps_skipped_dcf_upside_fixed():
+    # Financial Services: dcf_valuation skips the DCF and reports a fixed 0 upside
+    wl = make_watchlist()
+    wl.add("JPM", records(100, None, 120, dcf_weight=0.3, comps_weight=0.7, dcf_upside=0))
+
+    assert wl.reprice("JPM", 110)["exit"] == pytest.approx(0.7 * (120 / 110 - 1) * 100)
+
+
+def test_tick_reprices_only_changed_tickers():
+    source = SimulatedQuoteSource(seed=7, move_fraction=0.5)
+    wl = make_watchlist(source)
+    for ticker in ("AAPL", "MSFT", "NVDA", "AMZN"):
+        wl.add(ticker, records(100, 120, 110))
+    source.subscribe(list(wl.fair_values), wl.prices)
+
+    updates = wl.tick()
+
+    assert len(updates) == 2
+    for ticker, row in updates.items():
+        assert wl.prices[ticker] == row["price"]
+        assert row["exit"] == pytest.approx(wl.reprice(ticker, row["price"])["exit"])
+    for ticker in set(wl.fair_values) - set(updates):
+        assert wl.prices[ticker] == 100
+
+
+def test_add_skips_unusable_valuations():
+    wl = make_watchlist()
+    bad = records(100, 120, 110)
+    bad["exit"]["message"] = "Error: Scenario probabilities must add up to 1. Current total: 0.90"
+    wl.add("AAPL", bad)
+
+    assert "AAPL" not in wl.fair_values
+
+
+def test_ticker_without_exit_multiple_tracks_ggm_only(capsys):
+    source = SimulatedQuoteSource(seed=2, move_fraction=1.0)
+    wl = make_watchlist(source)
+    ggm_only = records(100, 120, 110)
+    ggm_only["exit"] = None
+    wl.add("AAPL", ggm_only)
+    source.subscribe(list(wl.fair_values), wl.prices)
+
+    updates = wl.tick()
+    watchlist.print_updates(updates, 0.1)
+
+    assert set(wl.upsides["AAPL"]) == {"ggm"}
+    assert "exit" not in updates["AAPL"]
+    assert "Exit:     n/a" in capsys.readouterr().out
+
+
+class FlakySource(QuoteSource):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def poll(self):
+        self.calls += 1
+        if self.calls == 2:
+            raise ConnectionError("download failed")
+        return {"AAPL": 100.0 + self.calls}
+
+
+def test_run_keeps_polling_after_failed_cycle():
+    wl = make_watchlist(FlakySource())
+    wl.add("AAPL", records(100, 120, 110))
+    batches = []
+
+    summary = wl.run(interval=0, cycles=3, on_update=lambda updates, latency_ms: batches.append(updates))
+
+    assert summary["cycles"] == 3
+    assert summary["failed"] == 1
+    assert [b["AAPL"]["price"] for b in batches] == [101.0, 103.0]
+
+
+def test_load_values_each_ticker_once(monkeypatch):
+    calls = []
+
+    def fake_value_ticker(ticker, base_weight, bull_weight, bear_weight, budget=None):
+        calls.append(ticker)
+        if ticker == "BAD":
+            raise ValueError("no data")
+        return records(50, 60, 55)
+
+    monkeypatch.setattr(watchlist, "value_ticker", fake_value_ticker)
+    source = SimulatedQuoteSource(seed=3)
+    wl = Watchlist(["aapl", "msft", "bad"], 0.5, 0.25, 0.25, source)
+
+    wl.load()
+
+    assert sorted(calls) == ["AAPL", "BAD", "MSFT"]
+    assert sorted(wl.fair_values) == ["AAPL", "MSFT"]
+    assert source.tickers == ["AAPL", "MSFT"]
+    assert source.prices == {"AAPL": 50.0, "MSFT": 50.0}
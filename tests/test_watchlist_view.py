@@ -0,0 +1,67 @@
+import watchlist_view
+from watchlist_view import ValuationPool, format_row, pending_row, sort_rows, wheel_step
+
+
+def row(ticker, exit_upside, status="Done"):
+    return {"ticker": ticker, "status": status, "exit": exit_upside, "ggm": exit_upside, "note": ""}
+
+
+def test_sort_rows_puts_missing_values_last():
+    rows = [row("AAPL", 5.0), pending_row("MSFT"), row("NVDA", 30.0), row("XOM", -2.0)]
+
+    assert [r["ticker"] for r in sort_rows(rows, "exit")] == ["XOM", "AAPL", "NVDA", "MSFT"]
+    assert [r["ticker"] for r in sort_rows(rows, "exit", reverse=True)] == ["NVDA", "AAPL", "XOM", "MSFT"]
+
+
+def test_wheel_step_uses_sign_of_delta():
+    # Windows sends 120 per notch, macOS sends 1
+    assert wheel_step(120) == wheel_step(1) == -3
+    assert wheel_step(-240) == wheel_step(-1) == 3
+    assert wheel_step(0) == 0
+
+
+def test_format_row_blanks_missing_upsides():
+    assert format_row(pending_row("AAPL")) == ["AAPL", "Pending", "", "", ""]
+    assert format_row(row("AAPL", 12.345)) == ["AAPL", "Done", "12.35", "12.35", ""]
+
+
+def record(upside, degraded=None, message=""):
+    return {"upside": upside, "degraded": degraded, "message": message}
+
+
+def test_pool_passes_budget_and_flags_degraded_rows(monkeypatch):
+    budgets = []
+
+    def fake_value_ticker(ticker, base_weight, bull_weight, bear_weight, budget=None):
+        budgets.append(budget)
+        if ticker == "BAD":
+            raise TimeoutError("wacc overran its deadline")
+        degraded = ["wacc (timed out, default 9.00% used)"] if ticker == "SLOW" else []
+        message = "Degraded inputs: wacc (timed out, default 9.00% used)" if degraded else ""
+        return {"exit": record(10.0, degraded, message), "ggm": record(5.0, degraded, message)}
+
+    monkeypatch.setattr(watchlist_view, "value_ticker", fake_value_ticker)
+    pool = ValuationPool(max_workers=2, budget=30)
+    pool.submit(["AAPL", "SLOW"], 0.5, 0.25, 0.25)
+    pool.submit(["BAD"], 0.5, 0.25, 0.25, budget=5)
+    pool.executor.shutdown(wait=True)
+
+    rows = {r["ticker"]: r for r in pool.drain()}
+    assert sorted(budgets) == [5, 30, 30]
+    assert rows["AAPL"]["status"] == "Done"
+    assert rows["SLOW"]["status"] == "Degraded"
+    assert rows["SLOW"]["note"] == "Degraded inputs: wacc (timed out, default 9.00% used)"
+    assert rows["BAD"]["status"] == "Error"
+    assert rows["BAD"]["exit"] is None
+
+
+def test_pool_marks_dcf_error_messages_as_errors(monkeypatch):
+    message = "Error: Scenario probabilities must add up to 1. Current total: 1.20"
+    monkeypatch.setattr(watchlist_view, "value_ticker",
+                        lambda *args, budget=None: {"exit": record(-30.0, message=message), "ggm": record(-20.0, message=message)})
+    pool = ValuationPool(max_workers=1)
+    pool.submit(["AAPL"], 0.6, 0.3, 0.3)
+    pool.executor.shutdown(wait=True)
+
+    [row] = pool.drain()
+    assert row == {"ticker": "AAPL", "status": "Error", "exit": None, "ggm": None, "note": message}